@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from .database import DATABASE_URL
+
+QUERY_CANCELED = "57014"
+
+
+class RouteClass:
+    """A group of routes sharing a concurrency limit, a wait queue, a connection pool
+    and a Postgres statement_timeout.
+
+    Each class gets its own engine sized to its concurrency limit, so heavy routes can
+    never take connections reserved for another class. Waiting happens on the event
+    loop, so the queue does not consume the threadpool that runs sync endpoints.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout, statement_timeout_ms):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+
+        self.engine = create_engine(
+            DATABASE_URL,
+            pool_size=max_concurrent,
+            max_overflow=0,
+            connect_args={"options": f"-c statement_timeout={statement_timeout_ms}"},
+        )
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.statement_timeouts = 0
+
+    async def acquire(self):
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                with self._lock:
+                    self.rejected_queue_full += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Too many concurrent {self.name} requests",
+                    headers={"Retry-After": "1"},
+                )
+            with self._lock:
+                self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self.rejected_queue_timeout += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Timed out waiting for a {self.name} slot",
+                    headers={"Retry-After": "1"},
+                )
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def _statement_timeout(self, e):
+        if getattr(e.orig, "pgcode", None) != QUERY_CANCELED:
+            return False
+        with self._lock:
+            self.statement_timeouts += 1
+        return True
+
+    async def get_db(self):
+        await self.acquire()
+        db = self.session_factory()
+        try:
+            yield db
+        except OperationalError as e:
+            if not self._statement_timeout(e):
+                raise
+            raise HTTPException(status_code=503, detail="Query exceeded statement timeout")
+        finally:
+            await run_in_threadpool(db.close)
+            self.release()
+
+    @contextmanager
+    def session(self):
+        """Session for background workers, whose pool size already caps concurrency."""
+        db = self.session_factory()
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+        try:
+            yield db
+        except OperationalError as e:
+            if not self._statement_timeout(e):
+                raise
+            raise HTTPException(status_code=503, detail="Query exceeded statement timeout")
+        finally:
+            db.close()
+            with self._lock:
+                self.active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "route_class": self.name,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "statement_timeout_ms": self.statement_timeout_ms,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_queue_timeout": self.rejected_queue_timeout,
+                "statement_timeouts": self.statement_timeouts,
+            }
+
+
+point = RouteClass(
+    "point",
+    max_concurrent=int(os.getenv("POINT_MAX_CONCURRENT", "10")),
+    max_queue=int(os.getenv("POINT_MAX_QUEUE", "50")),
+    queue_timeout=float(os.getenv("POINT_QUEUE_TIMEOUT", "1.0")),
+    statement_timeout_ms=int(os.getenv("POINT_STATEMENT_TIMEOUT_MS", "1000")),
+)
+
+analytics = RouteClass(
+    "analytics",
+    max_concurrent=int(os.getenv("ANALYTICS_MAX_CONCURRENT", "3")),
+    max_queue=int(os.getenv("ANALYTICS_MAX_QUEUE", "10")),
+    queue_timeout=float(os.getenv("ANALYTICS_QUEUE_TIMEOUT", "5.0")),
+    statement_timeout_ms=int(os.getenv("ANALYTICS_STATEMENT_TIMEOUT_MS", "30000")),
+)
+
+jobs = RouteClass(
+    "jobs",
+    max_concurrent=int(os.getenv("JOBS_MAX_WORKERS", "2")),
+    max_queue=0,
+    queue_timeout=0,
+    statement_timeout_ms=int(os.getenv("JOBS_STATEMENT_TIMEOUT_MS", "600000")),
+)
+
+route_classes = [point, analytics, jobs]
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import text
+
+from .database import SessionLocal
+from .models import Game, GameDeletion
+
+GAME_DELETE_CHUNK_SIZE = int(os.getenv("GAME_DELETE_CHUNK_SIZE", "1000"))
+GAME_DELETE_CHUNK_PAUSE = float(os.getenv("GAME_DELETE_CHUNK_PAUSE", "0.05"))
+GAME_DELETE_MAX_WORKERS = int(os.getenv("GAME_DELETE_MAX_WORKERS", "1"))
+
+ENABLE_BULK_DELETE = text("select set_config('game_portal.bulk_delete', 'on', true)")
+
+DELETE_REVIEWS_CHUNK = text("""
+    with deleted as (
+        delete from reviews
+        where game_id = :game_id
+          and review_id in (select review_id from reviews where game_id = :game_id limit :chunk_size)
+        returning review_id
+    )
+    select count(*) from deleted
+""")
+
+DELETE_PROGRESS_CHUNK = text("""
+    with deleted as (
+        delete from user_game_progress
+        where game_id = :game_id
+          and progress_id in (select progress_id from user_game_progress where game_id = :game_id limit :chunk_size)
+        returning user_id
+    )
+    select array_agg(user_id) from deleted
+""")
+
+RECOMPUTE_USER_TOTALS = text("""
+    update users u set
+        total_hours = coalesce((select sum(hours_played) from user_game_progress where user_id = u.user_id), 0)
+    where u.user_id = any(:user_ids)
+""")
+
+
+class GameDeleter:
+    """Deletes a hidden game's reviews and progress in short transactions, then the game.
+
+    Per-row aggregate triggers are switched off for each chunk through the
+    game_portal.bulk_delete setting; users' total_hours are recomputed once per chunk
+    for the users it touched, and each user has at most one progress row per game.
+    """
+
+    def __init__(self, chunk_size=GAME_DELETE_CHUNK_SIZE, chunk_pause=GAME_DELETE_CHUNK_PAUSE,
+                 max_workers=GAME_DELETE_MAX_WORKERS):
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause
+        self.max_workers = max_workers
+        self._executor = None
+        self._stopping = threading.Event()
+
+    def submit(self, db, game):
+        game.is_hidden = True
+        deletion = db.query(GameDeletion).filter(GameDeletion.game_id == game.game_id).first()
+        if deletion is None:
+            deletion = GameDeletion(game_id=game.game_id, status="running")
+            db.add(deletion)
+        elif deletion.status == "failed":
+            deletion.status = "running"
+            deletion.error = None
+            deletion.finished_at = None
+        else:
+            return deletion
+        db.commit()
+        db.refresh(deletion)
+        self._executor.submit(self._run, deletion.game_id)
+        return deletion
+
+    def _run(self, game_id):
+        try:
+            self._delete_reviews(game_id)
+            self._delete_progress(game_id)
+            self._delete_game(game_id)
+        except Exception as e:
+            self._update(game_id, status="failed", error=str(e), finished_at=datetime.now())
+
+    def _delete_reviews(self, game_id):
+        while not self._stopping.is_set():
+            with SessionLocal() as db:
+                db.execute(ENABLE_BULK_DELETE)
+                deleted = db.execute(
+                    DELETE_REVIEWS_CHUNK, {"game_id": game_id, "chunk_size": self.chunk_size}
+                ).scalar()
+                if deleted:
+                    self._increment(db, game_id, reviews_deleted=deleted)
+                db.commit()
+            if deleted < self.chunk_size:
+                return
+            time.sleep(self.chunk_pause)
+
+    def _delete_progress(self, game_id):
+        while not self._stopping.is_set():
+            with SessionLocal() as db:
+                db.execute(ENABLE_BULK_DELETE)
+                user_ids = db.execute(
+                    DELETE_PROGRESS_CHUNK, {"game_id": game_id, "chunk_size": self.chunk_size}
+                ).scalar() or []
+                affected = sorted(set(user_ids))
+                if affected:
+                    db.execute(RECOMPUTE_USER_TOTALS, {"user_ids": affected})
+                    self._increment(db, game_id, progress_deleted=len(user_ids), users_recomputed=len(affected))
+                db.commit()
+            if len(user_ids) < self.chunk_size:
+                return
+            time.sleep(self.chunk_pause)
+
+    def _delete_game(self, game_id):
+        if self._stopping.is_set():
+            return
+        with SessionLocal() as db:
+            db.query(Game).filter(Game.game_id == game_id).delete()
+            db.query(GameDeletion).filter(GameDeletion.game_id == game_id).update({
+                "status": "done",
+                "finished_at": datetime.now(),
+            })
+            db.commit()
+
+    @staticmethod
+    def _increment(db, game_id, **counters):
+        db.query(GameDeletion).filter(GameDeletion.game_id == game_id).update({
+            getattr(GameDeletion, name): getattr(GameDeletion, name) + value
+            for name, value in counters.items()
+        })
+
+    @staticmethod
+    def _update(game_id, **values):
+        with SessionLocal() as db:
+            db.query(GameDeletion).filter(GameDeletion.game_id == game_id).update(values)
+            db.commit()
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="game-deletion")
+        with SessionLocal() as db:
+            unfinished = [
+                deletion.game_id
+                for deletion in db.query(GameDeletion).filter(GameDeletion.status == "running")
+            ]
+        for game_id in unfinished:
+            self._executor.submit(self._run, game_id)
+
+    def stop(self):
+        if self._executor is None:
+            return
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+
+game_deleter = GameDeleter()
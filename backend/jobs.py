@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from . import admission
+from .database import SessionLocal
+from .models import ReportJob
+from .schemas import EmptyReportParams, TopPlayersByGenreParams, UserActivityParams
+
+logger = logging.getLogger(__name__)
+
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "20"))
+JOBS_RESULT_TTL = int(os.getenv("JOBS_RESULT_TTL", "3600"))
+JOBS_CLEANUP_INTERVAL = float(os.getenv("JOBS_CLEANUP_INTERVAL", "60"))
+JOBS_RESULT_BATCH = int(os.getenv("JOBS_RESULT_BATCH", "1000"))
+JOBS_FINISH_RETRIES = int(os.getenv("JOBS_FINISH_RETRIES", "3"))
+
+IN_FLIGHT = ("queued", "running")
+
+REPORTS = {
+    "user-activity": (UserActivityParams, "SELECT * FROM get_user_activity(:start_date, :end_date)"),
+    "top-players-by-genre": (TopPlayersByGenreParams, "SELECT * FROM get_top_players_by_genre(:genre_name)"),
+    "game-ratings": (EmptyReportParams, "select * from game_ratings_view"),
+    "user-stats": (EmptyReportParams, "select * from user_stats_view"),
+    "popular-games": (EmptyReportParams, "select * from popular_games_view"),
+}
+
+INSERT_RESULT_ROW = text(
+    "insert into report_job_rows (job_id, row_num, data) values (:job_id, :row_num, cast(:data as jsonb))"
+)
+
+
+class JobManager:
+    """Runs report queries on a local worker pool and stores their rows in report_job_rows.
+
+    Requests with the same report and parameters share one in-flight job, and finished
+    results are reused until they expire. The reaper fails in-flight jobs that no worker
+    of this process owns any more, or that have been running longer than the jobs
+    statement_timeout, so a lost job cannot keep absorbing identical requests.
+    """
+
+    def __init__(self, max_workers=admission.jobs.max_concurrent, max_queued=JOBS_MAX_QUEUED):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._tracked = set()
+        self._stop = threading.Event()
+        self._reaper = None
+
+    @staticmethod
+    def params_hash(report, params):
+        payload = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(f"{report}:{payload}".encode()).hexdigest()
+
+    def submit(self, db, report, params, retry=True):
+        params = jsonable_encoder(params)
+        params_hash = self.params_hash(report, params)
+
+        existing = self._find_reusable(db, params_hash)
+        if existing:
+            return existing, True
+
+        with self._lock:
+            if self._outstanding >= self.max_workers + self.max_queued:
+                raise HTTPException(status_code=429, detail="Too many report jobs queued", headers={"Retry-After": "5"})
+            self._outstanding += 1
+            job_id = str(uuid.uuid4())
+            self._tracked.add(job_id)
+
+        job = ReportJob(
+            job_id=job_id,
+            report=report,
+            params=params,
+            params_hash=params_hash,
+            status="queued",
+        )
+        db.add(job)
+        committed = False
+        try:
+            db.commit()
+            committed = True
+            db.refresh(job)
+            self._executor.submit(self._run, job_id)
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._outstanding -= 1
+                self._tracked.discard(job_id)
+            if committed:
+                self._finish_with_retry(job_id, "failed", error="Could not schedule the job")
+            if not isinstance(e, IntegrityError):
+                raise
+            # an identical job was created concurrently; it may already have failed
+            existing = self._find_reusable(db, params_hash)
+            if existing:
+                return existing, True
+            if retry:
+                return self.submit(db, report, params, retry=False)
+            raise HTTPException(status_code=409, detail="A conflicting job changed state, retry the request")
+
+        return job, False
+
+    @staticmethod
+    def _find_reusable(db, params_hash):
+        return (
+            db.query(ReportJob)
+            .filter(
+                ReportJob.params_hash == params_hash,
+                (ReportJob.status.in_(IN_FLIGHT))
+                | ((ReportJob.status == "done") & (ReportJob.expires_at > datetime.now())),
+            )
+            .order_by(ReportJob.created_at.desc())
+            .first()
+        )
+
+    def _run(self, job_id):
+        try:
+            self._execute(job_id)
+        except Exception as e:
+            logger.exception("Report job %s failed", job_id)
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            self._finish_with_retry(job_id, "failed", error=error)
+        finally:
+            with self._lock:
+                self._outstanding -= 1
+                self._tracked.discard(job_id)
+
+    def _execute(self, job_id):
+        db = SessionLocal()
+        try:
+            job = db.query(ReportJob).filter(ReportJob.job_id == job_id).first()
+            job.status = "running"
+            job.started_at = datetime.now()
+            db.commit()
+            report, params = job.report, job.params
+        finally:
+            db.close()
+
+        params_model, sql = REPORTS[report]
+        query_params = params_model.model_validate(params).model_dump()
+
+        with admission.jobs.session() as db:
+            result = db.execute(
+                text(sql).execution_options(stream_results=True, yield_per=JOBS_RESULT_BATCH),
+                query_params,
+            )
+            row_count = 0
+            for chunk in result.mappings().partitions():
+                db.execute(INSERT_RESULT_ROW, [
+                    {"job_id": job_id, "row_num": row_count + i, "data": json.dumps(jsonable_encoder(dict(row)))}
+                    for i, row in enumerate(chunk)
+                ])
+                row_count += len(chunk)
+
+            now = datetime.now()
+            db.execute(
+                text("""
+                    update report_jobs
+                    set status = 'done', row_count = :row_count, finished_at = :now, expires_at = :expires_at
+                    where job_id = :job_id and status = 'running'
+                """),
+                {"row_count": row_count, "now": now, "expires_at": now + timedelta(seconds=JOBS_RESULT_TTL),
+                 "job_id": job_id},
+            )
+            db.commit()
+
+    @staticmethod
+    def _finish(job_id, status, error=None):
+        now = datetime.now()
+        db = SessionLocal()
+        try:
+            db.query(ReportJob).filter(ReportJob.job_id == job_id, ReportJob.status.in_(IN_FLIGHT)).update({
+                "status": status,
+                "error": error,
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=JOBS_RESULT_TTL),
+            })
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish_with_retry(self, job_id, status, error=None):
+        # if every attempt fails the job is left untracked and the reaper fails it later
+        for attempt in range(JOBS_FINISH_RETRIES):
+            try:
+                self._finish(job_id, status, error=error)
+                return
+            except Exception:
+                logger.exception("Could not mark report job %s as %s (attempt %s)", job_id, status, attempt + 1)
+                if attempt + 1 < JOBS_FINISH_RETRIES and self._stop.wait(2 ** attempt):
+                    return
+
+    @staticmethod
+    def purge_expired():
+        db = SessionLocal()
+        try:
+            deleted = db.query(ReportJob).filter(ReportJob.expires_at < datetime.now()).delete()
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fail_interrupted():
+        now = datetime.now()
+        db = SessionLocal()
+        try:
+            db.query(ReportJob).filter(ReportJob.status.in_(IN_FLIGHT)).update({
+                "status": "failed",
+                "error": "Interrupted by server restart",
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=JOBS_RESULT_TTL),
+            })
+            db.commit()
+        finally:
+            db.close()
+
+    def fail_stale(self):
+        now = datetime.now()
+        started_before = now - timedelta(milliseconds=admission.jobs.statement_timeout_ms)
+        db = SessionLocal()
+        try:
+            with self._lock:
+                tracked = list(self._tracked)
+            failed = (
+                db.query(ReportJob)
+                .filter(
+                    ReportJob.status.in_(IN_FLIGHT),
+                    ReportJob.job_id.notin_(tracked) | (ReportJob.started_at < started_before),
+                )
+                .update({
+                    "status": "failed",
+                    "error": "Job was lost or exceeded the statement timeout",
+                    "finished_at": now,
+                    "expires_at": now + timedelta(seconds=JOBS_RESULT_TTL),
+                }, synchronize_session=False)
+            )
+            db.commit()
+            return failed
+        finally:
+            db.close()
+
+    def _reap(self):
+        while not self._stop.wait(JOBS_CLEANUP_INTERVAL):
+            try:
+                failed = self.fail_stale()
+                if failed:
+                    logger.warning("Failed %s stale report jobs", failed)
+                self.purge_expired()
+            except Exception:
+                logger.exception("Report job cleanup failed")
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._fail_interrupted()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-job")
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap, name="report-job-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        if self._executor is None:
+            return
+        self._stop.set()
+        self._reaper.join()
+        self._reaper = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+job_manager = JobManager()
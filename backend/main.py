@@ -1,10 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .routers import users, games, reviews, batch, views, stats
+from .routers import users, games, reviews, batch, views, stats, progress, metrics, jobs
 from .database import engine, Base
+from .progress_buffer import progress_buffer
+from .jobs import job_manager
+from .game_deletion import game_deleter
+from .trending import trending_maintainer
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Game Portal API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    progress_buffer.start()
+    job_manager.start()
+    game_deleter.start()
+    trending_maintainer.start()
+    yield
+    trending_maintainer.stop()
+    game_deleter.stop()
+    job_manager.stop()
+    progress_buffer.stop()
+
+
+app = FastAPI(title="Game Portal API", lifespan=lifespan)
 
 app.include_router(users.router)
 app.include_router(games.router)
@@ -12,6 +32,9 @@ app.include_router(reviews.router)
 app.include_router(batch.router)
 app.include_router(views.router)
 app.include_router(stats.router)
+app.include_router(progress.router)
+app.include_router(metrics.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 def root():
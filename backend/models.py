@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Text, Date, Boolean, ForeignKey, DateTime, func, Numeric, \
-    CheckConstraint, true
+    CheckConstraint, true, false, Index, text
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from .database import Base
 
 
@@ -41,6 +42,7 @@ class Game(Base):
     created_at = Column(DateTime, server_default=func.current_timestamp())
     average_rating = Column(Numeric(3, 2), server_default="0.0", default=0.0)
     review_count = Column(Integer, server_default="0", default=0)
+    is_hidden = Column(Boolean, server_default=false(), default=False, nullable=False)
 
     company = relationship("Company", back_populates="games")
 
@@ -98,4 +100,60 @@ class Review(Base):
     is_approved = Column(Boolean, server_default=true(), default=True)
 
     user = relationship("User", back_populates="reviews")
-    game = relationship("Game", back_populates="reviews")
\ No newline at end of file
+    game = relationship("Game", back_populates="reviews")
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    job_id = Column(String(36), primary_key=True)
+    report = Column(String(50), nullable=False)
+    params = Column(JSONB, nullable=False)
+    params_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)
+    row_count = Column(Integer)
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_report_jobs_params_hash", "params_hash"),
+        Index(
+            "idx_report_jobs_in_flight",
+            "params_hash",
+            unique=True,
+            postgresql_where=text("status in ('queued', 'running')")
+        ),
+        Index("idx_report_jobs_expires_at", "expires_at"),
+    )
+
+    rows = relationship(
+        "ReportJobRow",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+
+class ReportJobRow(Base):
+    __tablename__ = "report_job_rows"
+
+    job_id = Column(String(36), ForeignKey("report_jobs.job_id", ondelete="CASCADE"), primary_key=True)
+    row_num = Column(Integer, primary_key=True)
+    data = Column(JSONB, nullable=False)
+
+    job = relationship("ReportJob", back_populates="rows")
+
+
+class GameDeletion(Base):
+    __tablename__ = "game_deletions"
+
+    game_id = Column(Integer, primary_key=True)
+    status = Column(String(20), nullable=False)
+    reviews_deleted = Column(Integer, server_default="0", default=0, nullable=False)
+    progress_deleted = Column(Integer, server_default="0", default=0, nullable=False)
+    users_recomputed = Column(Integer, server_default="0", default=0, nullable=False)
+    error = Column(Text)
+    started_at = Column(DateTime, server_default=func.current_timestamp())
+    finished_at = Column(DateTime)
@@ -0,0 +1,295 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "2.0"))
+PROGRESS_FLUSH_MAX_PENDING = int(os.getenv("PROGRESS_FLUSH_MAX_PENDING", "500"))
+PROGRESS_DURABILITY = os.getenv("PROGRESS_DURABILITY", "buffered")
+
+DURABILITY_MODES = ("buffered", "sync")
+
+if PROGRESS_DURABILITY not in DURABILITY_MODES:
+    raise ValueError(f"PROGRESS_DURABILITY должен быть одним из {DURABILITY_MODES}")
+
+# status is not null, so a heartbeat without one takes the stored status (or 'Playing'
+# for a new row) in the select; excluded.status then never overwrites it with a default.
+UPSERT_PROGRESS = text("""
+    insert into user_game_progress (user_id, game_id, status, hours_played, last_played, last_updated)
+    select v.user_id, v.game_id, coalesce(v.status, ugp.status, 'Playing'), v.hours_played, v.last_played,
+           current_timestamp
+    from unnest(
+        cast(:user_ids as int[]),
+        cast(:game_ids as int[]),
+        cast(:statuses as varchar[]),
+        cast(:hours as int[]),
+        cast(:last_played as timestamp[])
+    ) as v(user_id, game_id, status, hours_played, last_played)
+    join users u on u.user_id = v.user_id
+    join games g on g.game_id = v.game_id and g.is_hidden = false
+    left join user_game_progress ugp on ugp.user_id = v.user_id and ugp.game_id = v.game_id
+    order by v.user_id, v.game_id
+    on conflict (user_id, game_id) do update set
+        status = excluded.status,
+        hours_played = greatest(user_game_progress.hours_played, excluded.hours_played),
+        last_played = greatest(user_game_progress.last_played, excluded.last_played),
+        last_updated = current_timestamp
+    where user_game_progress.status is distinct from excluded.status
+       or user_game_progress.hours_played < excluded.hours_played
+       or user_game_progress.last_played is distinct from
+          greatest(user_game_progress.last_played, excluded.last_played)
+""")
+
+VISIBLE_PROGRESS_KEYS = text("""
+    select v.user_id, v.game_id
+    from unnest(cast(:user_ids as int[]), cast(:game_ids as int[])) as v(user_id, game_id)
+    join users u on u.user_id = v.user_id
+    join games g on g.game_id = v.game_id and g.is_hidden = false
+""")
+
+
+class ProgressBuffer:
+    """Coalesces progress heartbeats per (user_id, game_id) and writes them in batches.
+
+    Heartbeats carry the client's running total of hours, so merging keeps the
+    largest value and the latest status; replays and retries are harmless.
+    Rows for unknown users or hidden games are dropped at flush time, and rows that
+    would not change anything are skipped so they fire no triggers. A batch rejected
+    by the database is retried row by row so one bad row cannot block the others;
+    only connection-level failures put the batch back into the buffer.
+    """
+
+    def __init__(self, flush_interval=PROGRESS_FLUSH_INTERVAL, max_pending=PROGRESS_FLUSH_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.received = 0
+        self.coalesced = 0
+        self.flushed_rows = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_at = None
+
+    def add(self, user_id, game_id, status, hours_played, last_played=None):
+        with self._lock:
+            self.received += 1
+            if self._coalesce(self._pending, user_id, game_id, status, hours_played, last_played):
+                self.coalesced += 1
+            pending = len(self._pending)
+
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    @classmethod
+    def _coalesce(cls, pending, user_id, game_id, status, hours_played, last_played):
+        key = (user_id, game_id)
+        current = pending.get(key)
+        if current is None:
+            pending[key] = {
+                "user_id": user_id,
+                "game_id": game_id,
+                "status": status,
+                "hours_played": hours_played,
+                "last_played": last_played,
+            }
+            return False
+        cls._merge(current, status, hours_played, last_played)
+        return True
+
+    @staticmethod
+    def _merge(row, status, hours_played, last_played):
+        if status is not None:
+            row["status"] = status
+        row["hours_played"] = max(row["hours_played"], hours_played)
+        if last_played is not None and (row["last_played"] is None or last_played > row["last_played"]):
+            row["last_played"] = last_played
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            rows = [batch[key] for key in sorted(batch)]
+            dropped = 0
+            db = SessionLocal()
+            try:
+                try:
+                    written = self._write(db, rows)
+                    db.commit()
+                except (DataError, IntegrityError):
+                    db.rollback()
+                    written, dropped = self._write_row_by_row(db, rows)
+                    db.commit()
+            except (OperationalError, InterfaceError):
+                db.rollback()
+                self._requeue(rows)
+                with self._lock:
+                    self.failed_flushes += 1
+                raise
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self.failed_flushes += 1
+                    self.dropped_rows += len(rows)
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(rows)
+                self.written_rows += written
+                self.dropped_rows += dropped
+                self.last_flush_at = datetime.now()
+            return len(rows)
+
+    def write_now(self, heartbeats):
+        """Writes heartbeats immediately, bypassing the buffer (sync durability).
+
+        Returns how many of the caller's (user_id, game_id) rows are stored, how many
+        of those changed, and how many were dropped because the user or game is
+        unknown or hidden, or the database rejected the row.
+        """
+        batch = {}
+        coalesced = 0
+        for user_id, game_id, status, hours_played, last_played in heartbeats:
+            if self._coalesce(batch, user_id, game_id, status, hours_played, last_played):
+                coalesced += 1
+        rows = [batch[key] for key in sorted(batch)]
+
+        db = SessionLocal()
+        try:
+            visible = {
+                (row.user_id, row.game_id)
+                for row in db.execute(VISIBLE_PROGRESS_KEYS, {
+                    "user_ids": [row["user_id"] for row in rows],
+                    "game_ids": [row["game_id"] for row in rows],
+                })
+            }
+            valid = [row for row in rows if (row["user_id"], row["game_id"]) in visible]
+            written = 0
+            rejected = 0
+            if valid:
+                try:
+                    with db.begin_nested():
+                        written = self._write(db, valid)
+                except (DataError, IntegrityError):
+                    written, rejected = self._write_row_by_row(db, valid)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self.failed_flushes += 1
+            raise
+        finally:
+            db.close()
+
+        dropped = len(rows) - len(valid) + rejected
+        with self._lock:
+            self.received += len(heartbeats)
+            self.coalesced += coalesced
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            self.written_rows += written
+            self.dropped_rows += dropped
+            self.last_flush_at = datetime.now()
+        return {
+            "stored": len(valid) - rejected,
+            "written": written,
+            "dropped": dropped,
+            "unknown": len(rows) - len(valid),
+        }
+
+    @staticmethod
+    def _write(db, rows):
+        result = db.execute(UPSERT_PROGRESS, {
+            "user_ids": [row["user_id"] for row in rows],
+            "game_ids": [row["game_id"] for row in rows],
+            "statuses": [row["status"] for row in rows],
+            "hours": [row["hours_played"] for row in rows],
+            "last_played": [row["last_played"] for row in rows],
+        })
+        return result.rowcount
+
+    def _write_row_by_row(self, db, rows):
+        written = 0
+        dropped = 0
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    written += self._write(db, [row])
+            except (DataError, IntegrityError):
+                dropped += 1
+        return written, dropped
+
+    def _requeue(self, rows):
+        with self._lock:
+            for row in rows:
+                key = (row["user_id"], row["game_id"])
+                current = self._pending.get(key)
+                if current is not None:
+                    row = dict(row)
+                    self._merge(row, current["status"], current["hours_played"], current["last_played"])
+                self._pending[key] = row
+
+    def stats(self):
+        with self._lock:
+            return {
+                "durability": PROGRESS_DURABILITY,
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "flushed_rows": self.flushed_rows,
+                "written_rows": self.written_rows,
+                "dropped_rows": self.dropped_rows,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "pending": len(self._pending),
+                "last_flush_at": self.last_flush_at,
+            }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Progress flush failed")
+                time.sleep(self.flush_interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+
+progress_buffer = ProgressBuffer()
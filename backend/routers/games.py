@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
+from ..admission import point
 from ..database import get_db
-from ..models import Game as GameModel
-from ..schemas import Game as GameSchema, GameCreate, GameUpdate, GameOut, GameDetail
+from ..game_deletion import game_deleter
+from ..models import Game as GameModel, GameDeletion
+from ..schemas import Game as GameSchema, GameCreate, GameUpdate, GameOut, GameDetail, GameDeletionStatus, \
+    TrendingGame
+from ..trending import get_trending
 
 router = APIRouter(prefix="/games", tags=["Games"])
 
@@ -22,9 +27,18 @@ def create_game(game: GameCreate, db: Session = Depends(get_db)):
     return new_game
 
 
+@router.get("/trending", response_model=List[TrendingGame])
+def get_trending_games(
+    limit: int = Query(10, ge=1, le=100),
+    window: Optional[Literal["hour", "day", "week"]] = None,
+    db: Session = Depends(point.get_db)
+):
+    return get_trending(db, limit, window)
+
+
 @router.get("/{game_id}", response_model=GameDetail)
-def get_game(game_id: int, db: Session = Depends(get_db)):
-    game = db.query(GameModel).filter(GameModel.game_id == game_id).first()
+def get_game(game_id: int, db: Session = Depends(point.get_db)):
+    game = db.query(GameModel).filter(GameModel.game_id == game_id, GameModel.is_hidden == False).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     return game
@@ -32,7 +46,7 @@ def get_game(game_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{game_id}", response_model=GameOut)
 def update_game(game_id: int, game_data: GameUpdate, db: Session = Depends(get_db)):
-    game = db.query(GameModel).filter(GameModel.game_id == game_id).first()
+    game = db.query(GameModel).filter(GameModel.game_id == game_id, GameModel.is_hidden == False).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
@@ -44,17 +58,32 @@ def update_game(game_id: int, game_data: GameUpdate, db: Session = Depends(get_d
     return game
 
 
-@router.delete("/{game_id}", status_code=204)
-def delete_game(game_id: int, db: Session = Depends(get_db)):
+@router.delete("/{game_id}", status_code=204, responses={202: {"model": GameDeletionStatus}})
+def delete_game(game_id: int, background: bool = False, db: Session = Depends(get_db)):
     game = db.query(GameModel).filter(GameModel.game_id == game_id).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
+    if background:
+        deletion = game_deleter.submit(db, game)
+        return JSONResponse(
+            status_code=202,
+            content=GameDeletionStatus.model_validate(deletion).model_dump(mode="json"),
+        )
+
     db.delete(game)
     db.commit()
 
 
+@router.get("/{game_id}/deletion", response_model=GameDeletionStatus)
+def get_game_deletion(game_id: int, db: Session = Depends(get_db)):
+    deletion = db.query(GameDeletion).filter(GameDeletion.game_id == game_id).first()
+    if not deletion:
+        raise HTTPException(status_code=404, detail="No deletion for this game")
+    return deletion
+
+
 
 @router.get("/", response_model=List[GameSchema])
 def get_games(db: Session = Depends(get_db)):
-    return db.query(GameModel).all()
+    return db.query(GameModel).filter(GameModel.is_hidden == False).all()
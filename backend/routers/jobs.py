@@ -0,0 +1,74 @@
+import json
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..jobs import job_manager, REPORTS
+from ..models import ReportJob, ReportJobRow
+from ..schemas import ReportJobOut, ReportJobResults
+
+router = APIRouter(prefix="/jobs", tags=["Report jobs"])
+
+
+def _job_out(job, deduplicated=False):
+    out = ReportJobOut.model_validate(job)
+    out.deduplicated = deduplicated
+    return out
+
+
+def _get_job_or_404(job_id, db):
+    job = db.query(ReportJob).filter(ReportJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@router.post("/{report}", response_model=ReportJobOut, status_code=202)
+def create_job(report: str, params: dict = Body(default={}), db: Session = Depends(get_db)):
+    if report not in REPORTS:
+        raise HTTPException(status_code=404, detail="Unknown report")
+
+    params_model, _ = REPORTS[report]
+    try:
+        validated = params_model.model_validate(params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+    job, deduplicated = job_manager.submit(db, report, validated)
+    return _job_out(job, deduplicated)
+
+
+@router.get("/{job_id}", response_model=ReportJobOut)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    return _job_out(_get_job_or_404(job_id, db))
+
+
+@router.get("/{job_id}/results", response_model=ReportJobResults)
+def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    job = _get_job_or_404(job_id, db)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    rows = (
+        db.query(ReportJobRow.data)
+        .filter(ReportJobRow.job_id == job_id, ReportJobRow.row_num >= offset)
+        .order_by(ReportJobRow.row_num)
+        .limit(limit)
+        .all()
+    )
+    next_offset = offset + limit if offset + limit < job.row_count else None
+    return {
+        "job_id": job_id,
+        "total": job.row_count,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": next_offset,
+        "rows": [row.data for row in rows],
+    }
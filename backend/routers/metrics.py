@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import List
+
+from ..admission import route_classes
+from ..schemas import RouteClassStats
+
+router = APIRouter(tags=["Metrics"])
+
+ADMISSION_METRICS = [
+    ("admission_active_requests", "gauge", "active", "Requests currently holding a slot"),
+    ("admission_queue_depth", "gauge", "queue_depth", "Requests waiting for a slot"),
+    ("admission_admitted_total", "counter", "admitted", "Requests admitted"),
+    ("admission_rejected_queue_full_total", "counter", "rejected_queue_full", "Requests rejected because the queue was full"),
+    ("admission_rejected_queue_timeout_total", "counter", "rejected_queue_timeout", "Requests rejected after waiting too long"),
+    ("admission_statement_timeouts_total", "counter", "statement_timeouts", "Queries cancelled by statement_timeout"),
+]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    snapshots = [route_class.stats() for route_class in route_classes]
+    lines = []
+    for metric, metric_type, field, description in ADMISSION_METRICS:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for snapshot in snapshots:
+            lines.append(f'{metric}{{route_class="{snapshot["route_class"]}"}} {snapshot[field]}')
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/admission/stats", response_model=List[RouteClassStats])
+def get_admission_stats():
+    return [route_class.stats() for route_class in route_classes]
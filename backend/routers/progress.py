@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List
+
+from ..progress_buffer import progress_buffer, PROGRESS_DURABILITY
+from ..schemas import ProgressHeartbeat, ProgressIngestResponse, ProgressBufferStats
+
+router = APIRouter(prefix="/progress", tags=["Progress"])
+
+
+def _ingest(heartbeats: List[ProgressHeartbeat], response: Response):
+    values = [
+        (heartbeat.user_id, heartbeat.game_id, heartbeat.status, heartbeat.hours_played, heartbeat.last_played)
+        for heartbeat in heartbeats
+    ]
+
+    if PROGRESS_DURABILITY == "sync":
+        try:
+            result = progress_buffer.write_now(values)
+        except SQLAlchemyError:
+            raise HTTPException(status_code=503, detail="Progress could not be persisted, retry later")
+
+        if heartbeats and result["stored"] == 0:
+            if result["unknown"] == result["dropped"]:
+                raise HTTPException(status_code=404, detail="User or game not found")
+            raise HTTPException(status_code=422, detail="Progress was rejected by the database")
+
+        response.status_code = 200
+        return {
+            "accepted": len(heartbeats),
+            "durability": PROGRESS_DURABILITY,
+            "pending": progress_buffer.stats()["pending"],
+            "stored": result["stored"],
+            "written": result["written"],
+            "dropped": result["dropped"],
+        }
+
+    for value in values:
+        progress_buffer.add(*value)
+
+    return {
+        "accepted": len(heartbeats),
+        "durability": PROGRESS_DURABILITY,
+        "pending": progress_buffer.stats()["pending"],
+    }
+
+
+@router.post("/heartbeat", response_model=ProgressIngestResponse, status_code=202)
+def report_heartbeat(heartbeat: ProgressHeartbeat, response: Response):
+    return _ingest([heartbeat], response)
+
+
+@router.post("/heartbeats", response_model=ProgressIngestResponse, status_code=202)
+def report_heartbeats(heartbeats: List[ProgressHeartbeat], response: Response):
+    return _ingest(heartbeats, response)
+
+
+@router.post("/flush", response_model=ProgressBufferStats)
+def flush_progress():
+    try:
+        progress_buffer.flush()
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="Progress could not be persisted, retry later")
+    return progress_buffer.stats()
+
+
+@router.get("/stats", response_model=ProgressBufferStats)
+def get_progress_stats():
+    return progress_buffer.stats()
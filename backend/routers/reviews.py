@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
+from ..admission import point
 from ..database import get_db
 from ..models import Review as ReviewModel
 from ..models import Game
@@ -12,7 +13,7 @@ router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
 @router.post("/user/{user_id}", response_model=ReviewSchema)
 def add_review(user_id: int, review: ReviewCreate, db: Session = Depends(get_db)):
-    game = db.query(Game).filter(Game.game_id == review.game_id).first()
+    game = db.query(Game).filter(Game.game_id == review.game_id, Game.is_hidden == False).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
@@ -24,7 +25,11 @@ def add_review(user_id: int, review: ReviewCreate, db: Session = Depends(get_db)
 
 
 @router.get("/game/{game_id}", response_model=List[ReviewSchema])
-def get_game_reviews(game_id: int, db: Session = Depends(get_db)):
+def get_game_reviews(game_id: int, db: Session = Depends(point.get_db)):
+    game = db.query(Game).filter(Game.game_id == game_id, Game.is_hidden == False).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
     reviews = (
         db.query(ReviewModel)
         .filter(ReviewModel.game_id == game_id, ReviewModel.is_approved == True)
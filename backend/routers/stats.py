@@ -3,15 +3,18 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
 
-from ..database import get_db
+from ..admission import point, analytics
 from ..schemas import *
 
 router = APIRouter(prefix="/stats", tags=["Statistics & Analytics"])
 
 
 @router.get("/game/{game_id}/rating", response_model=GameRatingResponse)
-def get_game_rating_endpoint(game_id: int, db: Session = Depends(get_db)):
-    result = db.execute(text("SELECT get_game_rating(:game_id)"), {"game_id": game_id})
+def get_game_rating_endpoint(game_id: int, db: Session = Depends(point.get_db)):
+    result = db.execute(
+        text("SELECT get_game_rating(game_id) FROM games WHERE game_id = :game_id AND is_hidden = false"),
+        {"game_id": game_id},
+    )
     rating = result.scalar()
     if rating is None:
         raise HTTPException(status_code=404, detail="Game not found or no approved reviews")
@@ -19,14 +22,14 @@ def get_game_rating_endpoint(game_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/user/{user_id}/total-hours", response_model=UserTotalHoursResponse)
-def get_user_total_hours_endpoint(user_id: int, db: Session = Depends(get_db)):
+def get_user_total_hours_endpoint(user_id: int, db: Session = Depends(point.get_db)):
     result = db.execute(text("SELECT get_user_total_hours(:user_id)"), {"user_id": user_id})
     total_hours = result.scalar()
     return {"total_hours": total_hours or 0}
 
 
 @router.get("/top-players/genre/{genre_name}", response_model=List[TopPlayerByGenre])
-def get_top_players_by_genre_endpoint(genre_name: str, db: Session = Depends(get_db)):
+def get_top_players_by_genre_endpoint(genre_name: str, db: Session = Depends(analytics.get_db)):
     result = db.execute(
         text("SELECT * FROM get_top_players_by_genre(:genre_name)"),
         {"genre_name": genre_name}
@@ -41,7 +44,7 @@ def get_top_players_by_genre_endpoint(genre_name: str, db: Session = Depends(get
 def get_user_activity_endpoint(
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db)
+    db: Session = Depends(analytics.get_db)
 ):
     if start_date > end_date:
         raise HTTPException(status_code=400, detail="start_date cannot be after end_date")
@@ -1,13 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import text
 from typing import List
 
 from .. import schemas
+from ..admission import point
 from ..database import get_db
 from ..models import User
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Everything is filtered by user_id first, so each part is a lookup on
+# idx_user_progress_user_hours / idx_reviews_user rather than a scan.
+USER_DASHBOARD_QUERY = text("""
+    with progress as (
+        select ugp.game_id, g.title, ugp.status, ugp.hours_played, ugp.last_played
+        from user_game_progress ugp
+        join games g on g.game_id = ugp.game_id and g.is_hidden = false
+        where ugp.user_id = :user_id
+    ),
+    recent_reviews as (
+        select r.review_id, r.game_id, g.title, r.rating, r.created_at
+        from reviews r
+        join games g on g.game_id = r.game_id and g.is_hidden = false
+        where r.user_id = :user_id
+        order by r.created_at desc
+        limit :reviews_limit
+    ),
+    most_played as (
+        select * from progress
+        order by hours_played desc, game_id
+        limit :games_limit
+    ),
+    status_breakdown as (
+        select status, count(*) as games from progress group by status
+    )
+    select u.user_id, u.username, u.email, u.registration_date, u.is_active, u.bio,
+           coalesce(u.total_hours, 0) as total_hours,
+           (select count(*) from progress) as total_games,
+           (select count(*) from progress where status = 'Completed') as completed_games,
+           coalesce((select json_object_agg(status, games) from status_breakdown), '{}') as status_breakdown,
+           coalesce((select json_agg(rr order by rr.created_at desc) from recent_reviews rr), '[]') as recent_reviews,
+           coalesce((select json_agg(mp order by mp.hours_played desc, mp.game_id) from most_played mp), '[]') as most_played
+    from users u
+    where u.user_id = :user_id
+""")
+
 
 @router.post("/", response_model=schemas.User)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
@@ -23,13 +61,30 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{user_id}", response_model=schemas.User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(point.get_db)):
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
+@router.get("/{user_id}/dashboard", response_model=schemas.UserDashboard)
+def get_user_dashboard(
+    user_id: int,
+    reviews_limit: int = Query(5, ge=0, le=50),
+    games_limit: int = Query(5, ge=0, le=50),
+    db: Session = Depends(point.get_db)
+):
+    result = db.execute(
+        USER_DASHBOARD_QUERY,
+        {"user_id": user_id, "reviews_limit": reviews_limit, "games_limit": games_limit}
+    )
+    dashboard = result.mappings().first()
+    if not dashboard:
+        raise HTTPException(status_code=404, detail="User not found")
+    return dashboard
+
+
 @router.get("/", response_model=List[schemas.User])
 def get_users(db: Session = Depends(get_db)):
     return db.query(User).all()
\ No newline at end of file
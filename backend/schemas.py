@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 class UserBase(BaseModel):
     username: str
@@ -135,3 +135,153 @@ class GameDetail(BaseModel):
     review_count: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+MAX_INT4 = 2 ** 31 - 1
+
+
+class ProgressHeartbeat(BaseModel):
+    user_id: int = Field(ge=1, le=MAX_INT4)
+    game_id: int = Field(ge=1, le=MAX_INT4)
+    status: Optional[Literal['Playing', 'Completed', 'Planned', 'Dropped']] = None
+    hours_played: int = Field(ge=0, le=MAX_INT4)
+    last_played: Optional[datetime] = None
+
+
+class ProgressIngestResponse(BaseModel):
+    accepted: int
+    durability: str
+    pending: int
+    stored: Optional[int] = None
+    written: Optional[int] = None
+    dropped: Optional[int] = None
+
+
+class ProgressBufferStats(BaseModel):
+    durability: str
+    received: int
+    coalesced: int
+    flushed_rows: int
+    written_rows: int
+    dropped_rows: int
+    flushes: int
+    failed_flushes: int
+    pending: int
+    last_flush_at: Optional[datetime] = None
+
+
+class RouteClassStats(BaseModel):
+    route_class: str
+    max_concurrent: int
+    max_queue: int
+    statement_timeout_ms: int
+    active: int
+    queue_depth: int
+    admitted: int
+    rejected_queue_full: int
+    rejected_queue_timeout: int
+    statement_timeouts: int
+
+
+class EmptyReportParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class TopPlayersByGenreParams(BaseModel):
+    genre_name: str
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class UserActivityParams(BaseModel):
+    start_date: date
+    end_date: date
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start_date > self.end_date:
+            raise ValueError("start_date cannot be after end_date")
+        return self
+
+
+class ReportJobOut(BaseModel):
+    job_id: str
+    report: str
+    params: dict
+    status: str
+    row_count: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    deduplicated: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReportJobResults(BaseModel):
+    job_id: str
+    total: int
+    offset: int
+    limit: int
+    next_offset: Optional[int] = None
+    rows: List[dict]
+
+
+class DashboardReview(BaseModel):
+    review_id: int
+    game_id: int
+    title: str
+    rating: int
+    created_at: datetime
+
+
+class DashboardGame(BaseModel):
+    game_id: int
+    title: str
+    status: str
+    hours_played: int
+    last_played: Optional[datetime] = None
+
+
+class UserDashboard(BaseModel):
+    user_id: int
+    username: str
+    email: str
+    registration_date: date
+    is_active: bool
+    bio: Optional[str] = None
+    total_hours: int
+    total_games: int
+    completed_games: int
+    status_breakdown: dict[str, int]
+    recent_reviews: List[DashboardReview]
+    most_played: List[DashboardGame]
+
+
+class GameDeletionStatus(BaseModel):
+    game_id: int
+    status: str
+    reviews_deleted: int
+    progress_deleted: int
+    users_recomputed: int
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TrendingGame(BaseModel):
+    game_id: int
+    title: str
+    score: float
+    events_hour: int
+    events_day: int
+    events_week: int
+    last_event_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
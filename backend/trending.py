@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+TRENDING_HALF_LIFE_HOURS = os.getenv("TRENDING_HALF_LIFE_HOURS")
+TRENDING_RETENTION_HOURS = int(os.getenv("TRENDING_RETENTION_HOURS", "168"))
+TRENDING_MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", "0.01"))
+TRENDING_PRUNE_INTERVAL = float(os.getenv("TRENDING_PRUNE_INTERVAL", "300"))
+
+WINDOWS = {
+    "hour": int(os.getenv("TRENDING_HOUR_WINDOW_HOURS", "1")),
+    "day": int(os.getenv("TRENDING_DAY_WINDOW_HOURS", "24")),
+    "week": int(os.getenv("TRENDING_WEEK_WINDOW_HOURS", "168")),
+}
+
+for _name, _hours in WINDOWS.items():
+    if _hours <= 0:
+        raise ValueError(f"TRENDING_{_name.upper()}_WINDOW_HOURS должен быть больше 0")
+
+if TRENDING_RETENTION_HOURS < max(WINDOWS.values()):
+    raise ValueError(f"TRENDING_RETENTION_HOURS должен покрывать самое длинное окно ({max(WINDOWS.values())} часов)")
+
+if TRENDING_MIN_SCORE <= 0:
+    raise ValueError("TRENDING_MIN_SCORE должен быть больше 0")
+
+if TRENDING_HALF_LIFE_HOURS is not None and float(TRENDING_HALF_LIFE_HOURS) <= 0:
+    raise ValueError("TRENDING_HALF_LIFE_HOURS должен быть больше 0")
+
+
+def _window_events(hours):
+    """Sliding-window event count over hourly buckets.
+
+    A window of N hours ends now, so it covers the current bucket, the N - 1 full
+    buckets before it and the part of the bucket N hours back that has not yet slid
+    out; events in that bucket are weighted by that part, assuming they are spread
+    evenly over the hour.
+    """
+    return f"""sum(b.events * case
+               when b.bucket_start > cfg.now_hour - make_interval(hours => {hours}) then 1
+               when b.bucket_start = cfg.now_hour - make_interval(hours => {hours}) then 1 - cfg.hour_elapsed
+               else 0
+           end)"""
+
+
+_TRENDING_SELECT = """
+    with cfg as (
+        select date_trunc('hour', localtimestamp) as now_hour,
+               extract(epoch from localtimestamp - date_trunc('hour', localtimestamp)) / 3600.0 as hour_elapsed,
+               extract(epoch from localtimestamp) / 3600.0 / half_life_hours * ln(2) as now_log
+        from trending_config
+    ),
+    top as ({top})
+    select top.game_id, g.title,
+           coalesce(exp(greatest(t.log_score - cfg.now_log, -700)), 0) as score,
+           coalesce(round(%(hour)s)::int, 0) as events_hour,
+           coalesce(round(%(day)s)::int, 0) as events_day,
+           coalesce(round(%(week)s)::int, 0) as events_week,
+           t.last_event_at
+    from top
+    cross join cfg
+    join games g on g.game_id = top.game_id
+    left join game_trending t on t.game_id = top.game_id
+    left join game_activity_buckets b
+        on b.game_id = top.game_id
+       and b.bucket_start >= cfg.now_hour - make_interval(hours => :max_window_hours)
+    group by top.game_id, top.rank, g.title, t.log_score, t.last_event_at, cfg.now_log
+    order by top.rank
+""" % {name: _window_events(f":{name}_window_hours") for name in WINDOWS}
+
+TOP_BY_SCORE = text(_TRENDING_SELECT.format(top="""
+        select t.game_id, row_number() over (order by t.log_score desc) as rank
+        from (
+            select t.game_id, t.log_score
+            from game_trending t
+            join games g on g.game_id = t.game_id and g.is_hidden = false
+            order by t.log_score desc
+            limit :limit
+        ) t
+"""))
+
+TOP_BY_WINDOW = text(_TRENDING_SELECT.format(top=f"""
+        select b.game_id, row_number() over (order by {_window_events(":window_hours")} desc, b.game_id) as rank
+        from game_activity_buckets b
+        cross join cfg
+        join games g on g.game_id = b.game_id and g.is_hidden = false
+        where b.bucket_start >= cfg.now_hour - make_interval(hours => :window_hours)
+        group by b.game_id
+        order by rank
+        limit :limit
+"""))
+
+PRUNE_BUCKETS = text("""
+    delete from game_activity_buckets
+    where bucket_start < date_trunc('hour', localtimestamp) - make_interval(hours => :retention_hours)
+""")
+
+PRUNE_SCORES = text("""
+    delete from game_trending
+    where log_score < (
+        select extract(epoch from localtimestamp) / 3600.0 / half_life_hours * ln(2)
+        from trending_config
+    ) + ln(:min_score)
+""")
+
+
+def get_trending(db, limit, window=None):
+    params = {f"{name}_window_hours": hours for name, hours in WINDOWS.items()}
+    params.update(limit=limit, max_window_hours=max(WINDOWS.values()))
+    if window is None:
+        result = db.execute(TOP_BY_SCORE, params)
+    else:
+        result = db.execute(TOP_BY_WINDOW, {**params, "window_hours": WINDOWS[window]})
+    return result.mappings().all()
+
+
+class TrendingMaintainer:
+    """Applies the configured half-life and trims the trending structures.
+
+    Counters themselves are maintained by the record_game_activity triggers; this only
+    drops buckets older than the retention period and games whose decayed score is
+    negligible, so top-K reads stay small.
+    """
+
+    def __init__(self, prune_interval=TRENDING_PRUNE_INTERVAL):
+        self.prune_interval = prune_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def apply_half_life():
+        if TRENDING_HALF_LIFE_HOURS is None:
+            return
+        half_life = float(TRENDING_HALF_LIFE_HOURS)
+        with SessionLocal() as db:
+            current = db.execute(text("select half_life_hours from trending_config")).scalar()
+            if current == half_life:
+                return
+            db.execute(text("update trending_config set half_life_hours = :half_life"), {"half_life": half_life})
+            db.execute(text("select rebuild_game_trending()"))
+            db.commit()
+
+    @staticmethod
+    def prune():
+        with SessionLocal() as db:
+            db.execute(PRUNE_BUCKETS, {"retention_hours": TRENDING_RETENTION_HOURS})
+            db.execute(PRUNE_SCORES, {"min_score": TRENDING_MIN_SCORE})
+            db.commit()
+
+    def _run(self):
+        while not self._stop.wait(self.prune_interval):
+            try:
+                self.prune()
+            except Exception:
+                logger.exception("Trending prune failed")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.apply_half_life()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trending-maintainer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+trending_maintainer = TrendingMaintainer()
@@ -0,0 +1,305 @@
+-- Optional: convert reviews (hash by game_id) and user_game_progress (hash by user_id)
+-- to declaratively partitioned tables. Works both on a freshly initialised database
+-- and online on a populated one:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f database/optional/partition_tables.sql
+--
+-- Stage 1 creates the partitioned copies and a mirror trigger that keeps them in sync
+-- with live writes. Stage 2 copies existing rows in committed chunks. Stage 3 swaps the
+-- tables in one short transaction and re-creates triggers and views on the new ones.
+-- The old tables are kept as *_unpartitioned until they are dropped by hand.
+-- Requires PostgreSQL 13+; must be run outside an explicit transaction (CALL commits).
+--
+-- Stages 1 and 2 are re-runnable: if the script stops before the swap commits, fix the
+-- cause and run it again, the backfill skips rows that were already copied. To abandon
+-- a partial run instead:
+--
+--   drop trigger if exists trig_mirror_reviews_to_part on reviews;
+--   drop trigger if exists trig_mirror_progress_to_part on user_game_progress;
+--   drop function if exists mirror_reviews_to_part();
+--   drop function if exists mirror_progress_to_part();
+--   drop procedure if exists partition_backfill(regclass, regclass, text, int);
+--   drop table if exists reviews_part, user_game_progress_part;
+
+
+-- Stage 3 re-creates the trending triggers and the views that filter games.is_hidden,
+-- so a database created before them is rejected here, before anything is copied.
+do $$
+begin
+    if not exists (
+        select 1 from information_schema.columns
+        where table_schema = current_schema() and table_name = 'games' and column_name = 'is_hidden'
+    ) or to_regprocedure('record_game_activity()') is null then
+        raise exception 'schema is out of date, run database/optional/upgrade_schema.sql first';
+    end if;
+end;
+$$;
+
+
+-- Stage 1: partitioned copies, indexes and mirror triggers
+
+-- databases created before audit_trigger_func accepted the table name need the new version
+create or replace function audit_trigger_func() returns trigger as $$
+declare
+    rec_id integer;
+    rel_name text;
+begin
+    -- on partitioned tables tg_relname is the partition, so the logical name is passed as an argument
+    rel_name := coalesce(tg_argv[0], tg_relname);
+
+    if rel_name = 'users' then
+        rec_id := coalesce(new.user_id, old.user_id);
+    elsif rel_name = 'games' then
+        rec_id := coalesce(new.game_id, old.game_id);
+    elsif rel_name = 'user_game_progress' then
+        rec_id := coalesce(new.progress_id, old.progress_id);
+    elsif rel_name = 'reviews' then
+        rec_id := coalesce(new.review_id, old.review_id);
+    else
+        rec_id := null;
+    end if;
+
+    insert into audit_logs (table_name, operation, user_id, record_id, old_data, new_data, changed_at)
+    values (
+        rel_name,
+        tg_op,
+        current_user,
+        rec_id,
+        row_to_json(old)::jsonb,
+        row_to_json(new)::jsonb,
+        current_timestamp
+    );
+
+    return null;
+end;
+$$ language plpgsql;
+
+create table if not exists reviews_part (
+    like reviews including defaults including constraints,
+    constraint reviews_part_pkey primary key (review_id, game_id),
+    constraint reviews_part_user_id_game_id_key unique (user_id, game_id),
+    constraint reviews_part_user_id_fkey foreign key (user_id)
+        references users(user_id) on delete cascade on update cascade,
+    constraint reviews_part_game_id_fkey foreign key (game_id)
+        references games(game_id) on delete cascade on update cascade
+) partition by hash (game_id);
+
+create table if not exists user_game_progress_part (
+    like user_game_progress including defaults including constraints,
+    constraint user_game_progress_part_pkey primary key (progress_id, user_id),
+    constraint user_game_progress_part_user_id_game_id_key unique (user_id, game_id),
+    constraint user_game_progress_part_user_id_fkey foreign key (user_id)
+        references users(user_id) on delete cascade on update cascade,
+    constraint user_game_progress_part_game_id_fkey foreign key (game_id)
+        references games(game_id) on delete cascade on update cascade
+) partition by hash (user_id);
+
+do $$
+declare
+    partitions constant int := 16;
+    i int;
+begin
+    for i in 0 .. partitions - 1 loop
+        execute format(
+            'create table if not exists reviews_p%s partition of reviews_part for values with (modulus %s, remainder %s)',
+            i, partitions, i);
+        execute format(
+            'create table if not exists user_game_progress_p%s partition of user_game_progress_part for values with (modulus %s, remainder %s)',
+            i, partitions, i);
+    end loop;
+end;
+$$;
+
+create index if not exists idx_reviews_part_game_approved_rating on reviews_part (game_id, is_approved) include (rating);
+create index if not exists idx_reviews_part_user on reviews_part (user_id);
+create index if not exists idx_reviews_part_created_at on reviews_part (created_at);
+create index if not exists idx_reviews_part_game_created on reviews_part (game_id, created_at desc);
+
+create index if not exists idx_user_progress_part_user_hours on user_game_progress_part (user_id) include (hours_played);
+create index if not exists idx_user_progress_part_game on user_game_progress_part (game_id);
+create index if not exists idx_user_progress_part_last_updated on user_game_progress_part (last_updated);
+
+create or replace function mirror_reviews_to_part() returns trigger as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        delete from reviews_part where review_id = old.review_id and game_id = old.game_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into reviews_part values (new.*) on conflict do nothing;
+    end if;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace function mirror_progress_to_part() returns trigger as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        delete from user_game_progress_part where progress_id = old.progress_id and user_id = old.user_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into user_game_progress_part values (new.*) on conflict do nothing;
+    end if;
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists trig_mirror_reviews_to_part on reviews;
+create trigger trig_mirror_reviews_to_part
+after insert or update or delete on reviews
+for each row execute function mirror_reviews_to_part();
+
+drop trigger if exists trig_mirror_progress_to_part on user_game_progress;
+create trigger trig_mirror_progress_to_part
+after insert or update or delete on user_game_progress
+for each row execute function mirror_progress_to_part();
+
+
+-- Stage 2: chunked backfill. Source rows are share-locked per chunk so a concurrent
+-- update either lands before the copy (and is copied in its latest version) or waits
+-- for the chunk to commit and is then applied by the mirror trigger.
+
+create or replace procedure partition_backfill(src regclass, dst regclass, key_column text, chunk_size int default 10000)
+language plpgsql as $$
+declare
+    max_key bigint;
+    lower_key bigint := 0;
+begin
+    execute format('select max(%I) from %s', key_column, src) into max_key;
+    while max_key is not null and lower_key <= max_key loop
+        execute format(
+            'insert into %s select * from %s where %I > $1 and %I <= $2 order by %I for share on conflict do nothing',
+            dst, src, key_column, key_column, key_column)
+        using lower_key, lower_key + chunk_size;
+        lower_key := lower_key + chunk_size;
+        commit;
+    end loop;
+end;
+$$;
+
+call partition_backfill('reviews', 'reviews_part', 'review_id');
+call partition_backfill('user_game_progress', 'user_game_progress_part', 'progress_id');
+
+analyze reviews_part;
+analyze user_game_progress_part;
+
+
+-- Stage 3: swap. Views bind to tables by oid, so they are re-created on the new tables.
+
+begin;
+
+lock table reviews, user_game_progress in access exclusive mode;
+
+drop trigger trig_mirror_reviews_to_part on reviews;
+drop trigger trig_mirror_progress_to_part on user_game_progress;
+drop function mirror_reviews_to_part();
+drop function mirror_progress_to_part();
+
+drop view game_ratings_view;
+drop view user_stats_view;
+drop view popular_games_view;
+
+alter table reviews rename to reviews_unpartitioned;
+alter table user_game_progress rename to user_game_progress_unpartitioned;
+
+drop trigger audit_reviews on reviews_unpartitioned;
+drop trigger trig_update_game_aggregates on reviews_unpartitioned;
+drop trigger audit_progress on user_game_progress_unpartitioned;
+drop trigger trig_update_user_total_hours on user_game_progress_unpartitioned;
+drop trigger if exists trig_record_progress_insert_activity on user_game_progress_unpartitioned;
+drop trigger if exists trig_record_progress_update_activity on user_game_progress_unpartitioned;
+drop trigger if exists trig_record_review_activity on reviews_unpartitioned;
+
+-- without this every user or game delete would also cascade, unbatched, into the old tables
+alter table reviews_unpartitioned
+    drop constraint reviews_user_id_fkey,
+    drop constraint reviews_game_id_fkey;
+alter table user_game_progress_unpartitioned
+    drop constraint user_game_progress_user_id_fkey,
+    drop constraint user_game_progress_game_id_fkey;
+
+alter index idx_reviews_game_approved_rating rename to idx_reviews_unpartitioned_game_approved_rating;
+alter index idx_reviews_user rename to idx_reviews_unpartitioned_user;
+alter index idx_reviews_created_at rename to idx_reviews_unpartitioned_created_at;
+alter index idx_reviews_game_created rename to idx_reviews_unpartitioned_game_created;
+alter index idx_user_progress_user_hours rename to idx_user_progress_unpartitioned_user_hours;
+alter index idx_user_progress_game rename to idx_user_progress_unpartitioned_game;
+alter index idx_user_progress_last_updated rename to idx_user_progress_unpartitioned_last_updated;
+
+alter table reviews_part rename to reviews;
+alter table user_game_progress_part rename to user_game_progress;
+
+alter index idx_reviews_part_game_approved_rating rename to idx_reviews_game_approved_rating;
+alter index idx_reviews_part_user rename to idx_reviews_user;
+alter index idx_reviews_part_created_at rename to idx_reviews_created_at;
+alter index idx_reviews_part_game_created rename to idx_reviews_game_created;
+alter index idx_user_progress_part_user_hours rename to idx_user_progress_user_hours;
+alter index idx_user_progress_part_game rename to idx_user_progress_game;
+alter index idx_user_progress_part_last_updated rename to idx_user_progress_last_updated;
+
+alter sequence reviews_review_id_seq owned by reviews.review_id;
+alter sequence user_game_progress_progress_id_seq owned by user_game_progress.progress_id;
+
+create trigger audit_reviews after insert or update or delete on reviews for each row execute function audit_trigger_func('reviews');
+create trigger audit_progress after insert or update or delete on user_game_progress for each row execute function audit_trigger_func('user_game_progress');
+
+create trigger trig_update_game_aggregates
+after insert or update or delete on reviews
+for each row execute function update_game_aggregates();
+
+create trigger trig_update_user_total_hours
+after insert or update or delete on user_game_progress
+for each row execute function update_user_total_hours();
+
+create trigger trig_record_progress_insert_activity
+after insert on user_game_progress
+referencing new table as new_rows
+for each statement execute function record_game_activity('user_game_progress');
+
+create trigger trig_record_progress_update_activity
+after update on user_game_progress
+referencing old table as old_rows new table as new_rows
+for each statement execute function record_game_activity('user_game_progress');
+
+create trigger trig_record_review_activity
+after insert on reviews
+referencing new table as new_rows
+for each statement execute function record_game_activity('reviews');
+
+create view game_ratings_view as
+select g.game_id, g.title, g.release_date,
+       coalesce(avg(r.rating), 0) as average_rating,
+       count(r.review_id) as review_count
+from games g
+left join reviews r on g.game_id = r.game_id and r.is_approved = true
+where g.is_hidden = false
+group by g.game_id;
+
+create view user_stats_view as
+select u.user_id, u.username, u.registration_date,
+       count(ugp.progress_id) as total_games,
+       count(case when ugp.status = 'Completed' then 1 end) as completed_games,
+       coalesce(sum(ugp.hours_played), 0) as total_hours
+from users u
+left join (user_game_progress ugp join games g on g.game_id = ugp.game_id and g.is_hidden = false)
+    on u.user_id = ugp.user_id
+group by u.user_id;
+
+create view popular_games_view as
+select g.game_id, g.title,
+       count(ugp.progress_id) as players_count,
+       coalesce(avg(r.rating), 0) as average_rating
+from games g
+left join user_game_progress ugp on g.game_id = ugp.game_id
+left join reviews r on g.game_id = r.game_id and r.is_approved = true
+where g.is_hidden = false
+group by g.game_id
+order by players_count desc
+limit 10;
+
+commit;
+
+drop procedure partition_backfill(regclass, regclass, text, int);
+
+-- After verifying the new tables:
+-- drop table reviews_unpartitioned;
+-- drop table user_game_progress_unpartitioned;
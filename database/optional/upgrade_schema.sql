@@ -0,0 +1,307 @@
+-- Upgrades a database initialised from an earlier init.sql to the current schema:
+-- games.is_hidden, background reports, chunked game deletion and trending games.
+-- The script is idempotent and runs in one transaction, so it can be repeated safely:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f database/optional/upgrade_schema.sql
+--
+-- Run it before starting the new backend version and before partition_tables.sql.
+
+begin;
+
+alter table games add column if not exists is_hidden boolean not null default false;
+
+create table if not exists game_deletions (
+    game_id int primary key,
+    status varchar(20) not null check (status in ('running', 'done', 'failed')),
+    reviews_deleted int not null default 0,
+    progress_deleted int not null default 0,
+    users_recomputed int not null default 0,
+    error text,
+    started_at timestamp not null default current_timestamp,
+    finished_at timestamp
+);
+
+create table if not exists trending_config (
+    id boolean primary key default true check (id),
+    half_life_hours double precision not null default 24 check (half_life_hours > 0)
+);
+
+insert into trending_config default values on conflict do nothing;
+
+create table if not exists game_activity_buckets (
+    game_id int not null,
+    bucket_start timestamp not null,
+    events int not null default 0,
+    primary key (game_id, bucket_start),
+    foreign key (game_id) references games(game_id) on delete cascade
+);
+
+create table if not exists game_trending (
+    game_id int primary key,
+    log_score double precision not null,
+    last_event_at timestamp not null,
+    foreign key (game_id) references games(game_id) on delete cascade
+);
+
+create table if not exists report_jobs (
+    job_id varchar(36) primary key,
+    report varchar(50) not null,
+    params jsonb not null,
+    params_hash varchar(64) not null,
+    status varchar(20) not null check (status in ('queued', 'running', 'done', 'failed')),
+    row_count int,
+    error text,
+    created_at timestamp not null default current_timestamp,
+    started_at timestamp,
+    finished_at timestamp,
+    expires_at timestamp
+);
+
+create table if not exists report_job_rows (
+    job_id varchar(36) not null,
+    row_num int not null,
+    data jsonb not null,
+    primary key (job_id, row_num),
+    foreign key (job_id) references report_jobs(job_id) on delete cascade
+);
+
+
+create or replace function audit_trigger_func() returns trigger as $$
+declare
+    rec_id integer;
+    rel_name text;
+begin
+    -- on partitioned tables tg_relname is the partition, so the logical name is passed as an argument
+    rel_name := coalesce(tg_argv[0], tg_relname);
+
+    if rel_name = 'users' then
+        rec_id := coalesce(new.user_id, old.user_id);
+    elsif rel_name = 'games' then
+        rec_id := coalesce(new.game_id, old.game_id);
+    elsif rel_name = 'user_game_progress' then
+        rec_id := coalesce(new.progress_id, old.progress_id);
+    elsif rel_name = 'reviews' then
+        rec_id := coalesce(new.review_id, old.review_id);
+    else
+        rec_id := null;
+    end if;
+
+    insert into audit_logs (table_name, operation, user_id, record_id, old_data, new_data, changed_at)
+    values (
+        rel_name,
+        tg_op,
+        current_user,
+        rec_id,
+        row_to_json(old)::jsonb,
+        row_to_json(new)::jsonb,
+        current_timestamp
+    );
+
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists audit_users on users;
+drop trigger if exists audit_users on games;
+drop trigger if exists audit_progress on user_game_progress;
+drop trigger if exists audit_reviews on reviews;
+create trigger audit_users after insert or update or delete on users for each row execute function audit_trigger_func('users');
+create trigger audit_users after insert or update or delete on games for each row execute function audit_trigger_func('games');
+create trigger audit_progress after insert or update or delete on user_game_progress for each row execute function audit_trigger_func('user_game_progress');
+create trigger audit_reviews after insert or update or delete on reviews for each row execute function audit_trigger_func('reviews');
+
+
+create or replace function update_game_aggregates() returns trigger as $$
+declare
+    gid integer;
+begin
+    -- chunked game deletion removes the game itself, so there is nothing to recompute
+    if current_setting('game_portal.bulk_delete', true) = 'on' then
+        return null;
+    end if;
+
+    if tg_op = 'DELETE' then
+        gid := old.game_id;
+    else
+        gid := new.game_id;
+    end if;
+    update games set
+        average_rating = coalesce((select avg(rating) from reviews where game_id = gid and is_approved = true), 0.0),
+        review_count = (select count(*) from reviews where game_id = gid and is_approved = true)
+    where game_id = gid;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace function update_user_total_hours() returns trigger as $$
+declare
+    uid integer;
+begin
+    -- chunked game deletion recomputes totals once per affected user instead
+    if current_setting('game_portal.bulk_delete', true) = 'on' then
+        return null;
+    end if;
+
+    if tg_op = 'DELETE' then
+        uid := old.user_id;
+    else
+        uid := new.user_id;
+    end if;
+    update users set
+        total_hours = coalesce((select sum(hours_played) from user_game_progress where user_id = uid), 0)
+    where user_id = uid;
+    return null;
+end;
+$$ language plpgsql;
+
+-- game_trending.log_score is ln(sum over events of 2 ^ (event_hours / half_life)),
+-- so every game decays at the same rate and ordering by log_score is the current
+-- trending order; the actual score at time t is exp(log_score - t_hours / half_life * ln 2).
+-- Exponents are clamped at -700 because exp() raises an underflow error below about -708.
+create or replace function apply_game_activity(game_ids int[], event_times timestamp[]) returns void as $$
+    with events as (
+        select e.game_id, e.event_at,
+               extract(epoch from e.event_at) / 3600.0 / c.half_life_hours * ln(2) as x
+        from unnest(game_ids, event_times) as e(game_id, event_at)
+        cross join trending_config c
+        where e.event_at is not null
+    ),
+    buckets as (
+        insert into game_activity_buckets (game_id, bucket_start, events)
+        select game_id, date_trunc('hour', event_at), count(*)
+        from events
+        group by 1, 2
+        order by 1, 2
+        on conflict (game_id, bucket_start) do update set events = game_activity_buckets.events + excluded.events
+    )
+    insert into game_trending (game_id, log_score, last_event_at)
+    select game_id, max_x + ln(sum(exp(greatest(x - max_x, -700)))), max(event_at)
+    from (select events.*, max(x) over (partition by game_id) as max_x from events) e
+    group by game_id, max_x
+    order by game_id
+    on conflict (game_id) do update set
+        log_score = greatest(game_trending.log_score, excluded.log_score)
+                    + ln(1 + exp(greatest(-abs(game_trending.log_score - excluded.log_score), -700))),
+        last_event_at = greatest(game_trending.last_event_at, excluded.last_event_at);
+$$ language sql;
+
+-- Statement-level, so a batched write touches each game's trending row once.
+-- A progress row counts once when it is created and then at most once per hour
+-- (when last_updated moves into a later hour bucket), so the score follows
+-- player activity rather than how often heartbeats are flushed.
+create or replace function record_game_activity() returns trigger as $$
+begin
+    if tg_argv[0] = 'reviews' then
+        perform apply_game_activity(s.game_ids, s.event_times)
+        from (select array_agg(game_id) as game_ids, array_agg(created_at) as event_times from new_rows) s;
+    elsif tg_op = 'INSERT' then
+        perform apply_game_activity(s.game_ids, s.event_times)
+        from (select array_agg(game_id) as game_ids, array_agg(last_updated) as event_times from new_rows) s;
+    else
+        perform apply_game_activity(s.game_ids, s.event_times)
+        from (
+            select array_agg(n.game_id) as game_ids, array_agg(n.last_updated) as event_times
+            from new_rows n
+            join old_rows o on o.progress_id = n.progress_id and o.user_id = n.user_id
+            where date_trunc('hour', o.last_updated) < date_trunc('hour', n.last_updated)
+        ) s;
+    end if;
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists trig_record_progress_insert_activity on user_game_progress;
+create trigger trig_record_progress_insert_activity
+after insert on user_game_progress
+referencing new table as new_rows
+for each statement execute function record_game_activity('user_game_progress');
+
+drop trigger if exists trig_record_progress_update_activity on user_game_progress;
+create trigger trig_record_progress_update_activity
+after update on user_game_progress
+referencing old table as old_rows new table as new_rows
+for each statement execute function record_game_activity('user_game_progress');
+
+drop trigger if exists trig_record_review_activity on reviews;
+create trigger trig_record_review_activity
+after insert on reviews
+referencing new table as new_rows
+for each statement execute function record_game_activity('reviews');
+
+-- recomputes game_trending from the retained hourly buckets, e.g. after half_life_hours changes
+create or replace function rebuild_game_trending() returns void as $$
+    delete from game_trending;
+    insert into game_trending (game_id, log_score, last_event_at)
+    select game_id,
+           max(x) + ln(sum(events * exp(greatest(x - max_x, -700)))),
+           max(bucket_start) + interval '1 hour'
+    from (
+        select b.game_id, b.bucket_start, b.events, v.x, max(v.x) over (partition by b.game_id) as max_x
+        from game_activity_buckets b
+        cross join trending_config c
+        cross join lateral (select extract(epoch from b.bucket_start + interval '30 minutes') / 3600.0
+                                   / c.half_life_hours * ln(2) as x) v
+    ) t
+    group by game_id;
+$$ language sql;
+
+
+create or replace function get_top_players_by_genre(genre_name varchar) returns table(
+    user_id int,
+    username varchar,
+    total_hours int
+) as $$
+select u.user_id, u.username, sum(ugp.hours_played) as total_hours
+from users u
+join user_game_progress ugp on u.user_id = ugp.user_id
+join games g on ugp.game_id = g.game_id
+join game_genres gg on g.game_id = gg.game_id
+join genres gen on gg.genre_id = gen.genre_id
+where gen.name ilike genre_name
+  and g.is_hidden = false
+group by u.user_id, u.username
+order by total_hours desc
+limit 10;
+$$ language sql;
+
+
+create or replace view game_ratings_view as
+select g.game_id, g.title, g.release_date,
+       coalesce(avg(r.rating), 0) as average_rating,
+       count(r.review_id) as review_count
+from games g
+left join reviews r on g.game_id = r.game_id and r.is_approved = true
+where g.is_hidden = false
+group by g.game_id;
+
+create or replace view user_stats_view as
+select u.user_id, u.username, u.registration_date,
+       count(ugp.progress_id) as total_games,
+       count(case when ugp.status = 'Completed' then 1 end) as completed_games,
+       coalesce(sum(ugp.hours_played), 0) as total_hours
+from users u
+left join (user_game_progress ugp join games g on g.game_id = ugp.game_id and g.is_hidden = false)
+    on u.user_id = ugp.user_id
+group by u.user_id;
+
+create or replace view popular_games_view as
+select g.game_id, g.title,
+       count(ugp.progress_id) as players_count,
+       coalesce(avg(r.rating), 0) as average_rating
+from games g
+left join user_game_progress ugp on g.game_id = ugp.game_id
+left join reviews r on g.game_id = r.game_id and r.is_approved = true
+where g.is_hidden = false
+group by g.game_id
+order by players_count desc
+limit 10;
+
+
+create index if not exists idx_report_jobs_params_hash on report_jobs(params_hash);
+create unique index if not exists idx_report_jobs_in_flight on report_jobs(params_hash) where status in ('queued', 'running');
+create index if not exists idx_report_jobs_expires_at on report_jobs(expires_at);
+
+create index if not exists idx_game_trending_log_score on game_trending(log_score desc);
+create index if not exists idx_game_activity_buckets_bucket_start on game_activity_buckets(bucket_start);
+
+commit;